@@ -1,21 +1,56 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, send_from_directory, g
 from flask_cors import CORS
 from flask_restful import Api, Resource
+import orjson
 import sqlite3
+import hashlib
 import json
 import os
+import queue
+import threading
+import time
+import functools
 from datetime import datetime
 import random
 
 app = Flask(__name__)
+# Anything still encoded by Flask's own provider skips \uXXXX escaping,
+# key sorting and pretty-printing
+app.json.ensure_ascii = False
+app.json.sort_keys = False
+app.json.compact = True
 CORS(app)
 api = Api(app)
 
+# DATABASE_PATH lets parallel test workers each serve their own file
+DATABASE = os.environ.get('DATABASE_PATH', 'robotics_dashboard.db')
+POOL_SIZE = 5
+
+# Applied to every pooled connection: WAL lets readers run alongside
+# writers, and mmap serves reads from mapped pages instead of pread()
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA busy_timeout=5000',
+)
+
 # Database initialization
-def init_db():
-    conn = sqlite3.connect('robotics_dashboard.db')
+def init_db(force=False):
+    if os.environ.get('SKIP_DB_INIT') and not force:
+        return
+    
+    conn = sqlite3.connect(DATABASE)
     cursor = conn.cursor()
     
+    # Schema and sample data go in as one transaction: a single commit.
+    # IMMEDIATE takes the write lock up front, so app processes initializing
+    # side by side wait on the busy timeout instead of failing with
+    # 'database is locked' when another one's write invalidates their read
+    cursor.execute('BEGIN IMMEDIATE')
+    
     # Create tables
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS robots (
@@ -51,6 +86,31 @@ def init_db():
         )
     ''')
     
+    # Bumped by trigger on every robots/tasks write; serves as a cheap ETag
+    # for the read endpoints that only depend on those tables
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)')
+    for table in ('robots', 'tasks'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS bump_version_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_version SET version = version + 1;
+                END
+            ''')
+    
+    # Indexes for the latest-readings query and the GROUP BY status stats
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_robot_ts ON sensor_data (robot_id, timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sensor_ts ON sensor_data (timestamp DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_robots_status ON robots (status)')
+    
     # Insert sample data
     sample_robots = [
         ('R2D2', 'active', 85, 'Warehouse A'),
@@ -60,38 +120,139 @@ def init_db():
         ('Optimus', 'active', 78, 'Assembly Line')
     ]
     
+    # Skip robots that are already there so re-running init_db() does not
+    # duplicate them
     cursor.executemany('''
-        INSERT OR IGNORE INTO robots (name, status, battery_level, location)
-        VALUES (?, ?, ?, ?)
-    ''', sample_robots)
+        INSERT INTO robots (name, status, battery_level, location)
+        SELECT ?, ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM robots WHERE name = ?)
+    ''', [robot + (robot[0],) for robot in sample_robots])
     
     conn.commit()
     conn.close()
 
-# Initialize database
-init_db()
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the tables and load the sample robots"""
+    # An explicit command always initializes, whatever SKIP_DB_INIT says
+    init_db(force=True)
+    print('✅ Database initialized')
+
+# Connection pooling
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections reused across requests"""
+    
+    def __init__(self, database, size=POOL_SIZE):
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._connect(database))
+    
+    def _connect(self, database):
+        # detect_types=0: timestamps come back as the TEXT the API returns,
+        # with no converter lookups per column
+        conn = sqlite3.connect(database, check_same_thread=False, detect_types=0)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def acquire(self):
+        return self._connections.get()
+    
+    def release(self, conn):
+        # Never hand a half-finished transaction to the next request
+        if conn.in_transaction:
+            conn.rollback()
+        self._connections.put(conn)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """This process's connection pool, opened on first use"""
+    global _pool, _pool_pid
+    # Opening lazily keeps `import app` free of database work, and checking
+    # the pid gives a forked worker its own connections
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = ConnectionPool(DATABASE)
+                _pool_pid = os.getpid()
+    return _pool
+
+def get_db():
+    """Pooled connection for the current request, acquired on first use"""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+@app.teardown_request
+def release_db(exception=None):
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def json_body_response(body):
+    """Wrap an already-encoded JSON document in a response"""
+    return Response(body, mimetype='application/json')
+
+def ojson(obj):
+    """jsonify() replacement backed by orjson's C encoder"""
+    return json_body_response(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
+def data_etag():
+    """ETag for responses built only from the robots and tasks tables"""
+    cursor = get_db().cursor()
+    try:
+        cursor.execute('SELECT version FROM data_version')
+    except sqlite3.OperationalError:
+        # Database created before data_version existed and opened with
+        # SKIP_DB_INIT: serve full responses without validators
+        return None
+    version = str(cursor.fetchone()[0])
+    return hashlib.blake2b(version.encode(), digest_size=8).hexdigest()
+
+def is_fresh(etag):
+    """True if the client's cached copy still matches etag"""
+    return etag is not None and request.if_none_match.contains(etag)
+
+def not_modified(etag):
+    return with_etag(Response(status=304), etag)
+
+def with_etag(response, etag):
+    if etag is None:
+        return response
+    # no-cache: clients keep the body but revalidate on every poll
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@api.representation('application/json')
+def output_json(data, code, headers=None):
+    """Encode dicts returned by the Resources with orjson too"""
+    response = ojson(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
 
 # API Resources
 class RobotList(Resource):
     def get(self):
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM robots')
-        robots = cursor.fetchall()
-        conn.close()
+        etag = data_etag()
+        if is_fresh(etag):
+            return not_modified(etag)
         
-        robot_list = []
-        for robot in robots:
-            robot_list.append({
-                'id': robot[0],
-                'name': robot[1],
-                'status': robot[2],
-                'battery_level': robot[3],
-                'location': robot[4],
-                'last_updated': robot[5]
-            })
+        # SQLite builds the JSON document itself; no per-row Python objects
+        cursor = get_db().cursor()
+        cursor.execute('''
+            SELECT json_object('robots', json_group_array(json_object(
+                'id', id, 'name', name, 'status', status, 'battery_level', battery_level,
+                'location', location, 'last_updated', last_updated
+            ))) FROM robots
+        ''')
         
-        return {'robots': robot_list}
+        return with_etag(json_body_response(cursor.fetchone()[0]), etag)
     
     def post(self):
         data = request.get_json()
@@ -100,99 +261,83 @@ class RobotList(Resource):
         battery_level = data.get('battery_level', 100)
         location = data.get('location', 'Unknown')
         
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
+        cursor = get_db().cursor()
         cursor.execute('''
             INSERT INTO robots (name, status, battery_level, location)
             VALUES (?, ?, ?, ?)
         ''', (name, status, battery_level, location))
         robot_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        # Echo the stored row so clients need no follow-up GET
+        cursor.execute('SELECT * FROM robots WHERE id = ?', (robot_id,))
+        robot = cursor.fetchone()
+        get_db().commit()
         
-        return {'message': 'Robot created successfully', 'id': robot_id}, 201
+        return {'message': 'Robot created successfully', 'id': robot_id, 'robot': dict(robot)}, 201
 
 class RobotDetail(Resource):
     def get(self, robot_id):
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
+        cursor = get_db().cursor()
         cursor.execute('SELECT * FROM robots WHERE id = ?', (robot_id,))
         robot = cursor.fetchone()
-        conn.close()
         
         if robot:
-            return {
-                'id': robot[0],
-                'name': robot[1],
-                'status': robot[2],
-                'battery_level': robot[3],
-                'location': robot[4],
-                'last_updated': robot[5]
-            }
+            return dict(robot)
         return {'error': 'Robot not found'}, 404
     
     def put(self, robot_id):
         data = request.get_json()
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
+        cursor = get_db().cursor()
         
         cursor.execute('''
             UPDATE robots 
             SET status = ?, battery_level = ?, location = ?, last_updated = CURRENT_TIMESTAMP
             WHERE id = ?
         ''', (data.get('status'), data.get('battery_level'), data.get('location'), robot_id))
+        cursor.execute('SELECT * FROM robots WHERE id = ?', (robot_id,))
+        robot = cursor.fetchone()
+        get_db().commit()
         
-        conn.commit()
-        conn.close()
-        
-        return {'message': 'Robot updated successfully'}
+        if robot is None:
+            return {'error': 'Robot not found'}, 404
+        return {'message': 'Robot updated successfully', 'robot': dict(robot)}
 
 class TaskList(Resource):
     def get(self):
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM tasks')
-        tasks = cursor.fetchall()
-        conn.close()
-        
-        task_list = []
-        for task in tasks:
-            task_list.append({
-                'id': task[0],
-                'robot_id': task[1],
-                'task_type': task[2],
-                'status': task[3],
-                'priority': task[4],
-                'created_at': task[5]
-            })
+        cursor = get_db().cursor()
+        cursor.execute('''
+            SELECT json_object('tasks', json_group_array(json_object(
+                'id', id, 'robot_id', robot_id, 'task_type', task_type, 'status', status,
+                'priority', priority, 'created_at', created_at
+            ))) FROM tasks
+        ''')
         
-        return {'tasks': task_list}
+        return json_body_response(cursor.fetchone()[0])
+
+SENSOR_DATA_LIMIT = 100
 
 class SensorData(Resource):
     def get(self):
         robot_id = request.args.get('robot_id')
-        conn = sqlite3.connect('robotics_dashboard.db')
-        cursor = conn.cursor()
+        # ?limit=N trims the reply for callers that only need a few readings
+        limit = request.args.get('limit', SENSOR_DATA_LIMIT, type=int)
+        limit = min(max(limit, 0), SENSOR_DATA_LIMIT)
+        cursor = get_db().cursor()
         
         if robot_id:
-            cursor.execute('SELECT * FROM sensor_data WHERE robot_id = ? ORDER BY timestamp DESC LIMIT 100', (robot_id,))
+            latest = 'SELECT * FROM sensor_data WHERE robot_id = ? ORDER BY timestamp DESC LIMIT ?'
+            params = (robot_id, limit)
         else:
-            cursor.execute('SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT 100')
-        
-        data = cursor.fetchall()
-        conn.close()
+            latest = 'SELECT * FROM sensor_data ORDER BY timestamp DESC LIMIT ?'
+            params = (limit,)
         
-        sensor_list = []
-        for sensor in data:
-            sensor_list.append({
-                'id': sensor[0],
-                'robot_id': sensor[1],
-                'sensor_type': sensor[2],
-                'value': sensor[3],
-                'timestamp': sensor[4]
-            })
+        cursor.execute(f'''
+            SELECT json_object('sensor_data', json_group_array(json_object(
+                'id', id, 'robot_id', robot_id, 'sensor_type', sensor_type, 'value', value,
+                'timestamp', timestamp
+            ))) FROM ({latest})
+        ''', params)
         
-        return {'sensor_data': sensor_list}
+        return json_body_response(cursor.fetchone()[0])
 
 # Add API resources
 api.add_resource(RobotList, '/api/robots')
@@ -205,36 +350,52 @@ api.add_resource(SensorData, '/api/sensor-data')
 def dashboard():
     return render_template('dashboard.html')
 
+@functools.lru_cache(maxsize=1)
+def health_body(second):
+    """Encoded health payload, rebuilt at most once per second"""
+    return orjson.dumps({'status': 'healthy', 'timestamp': datetime.fromtimestamp(second).isoformat()})
+
 @app.route('/api/health')
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+    return json_body_response(health_body(int(time.time())))
 
 @app.route('/api/stats')
 def get_stats():
-    conn = sqlite3.connect('robotics_dashboard.db')
-    cursor = conn.cursor()
+    etag = data_etag()
+    if is_fresh(etag):
+        return not_modified(etag)
     
-    # Get robot count by status
-    cursor.execute('SELECT status, COUNT(*) FROM robots GROUP BY status')
-    status_counts = dict(cursor.fetchall())
+    cursor = get_db().cursor()
     
-    # Get average battery level
-    cursor.execute('SELECT AVG(battery_level) FROM robots')
-    avg_battery = cursor.fetchone()[0] or 0
-    
-    # Get task count by status
-    cursor.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status')
-    task_counts = dict(cursor.fetchall())
+    # Robot counts by status, task counts by status and the average battery
+    # level in one round-trip, tagged by source
+    cursor.execute('''
+        SELECT 'robots', status, COUNT(*) FROM robots GROUP BY status
+        UNION ALL
+        SELECT 'tasks', status, COUNT(*) FROM tasks GROUP BY status
+        UNION ALL
+        SELECT 'battery', NULL, AVG(battery_level) FROM robots
+    ''')
     
-    conn.close()
+    status_counts = {}
+    task_counts = {}
+    avg_battery = 0
+    for source, status, value in cursor:
+        if source == 'robots':
+            status_counts[status] = value
+        elif source == 'tasks':
+            task_counts[status] = value
+        else:
+            avg_battery = value or 0
     
-    return jsonify({
+    return with_etag(ojson({
         'robot_status_counts': status_counts,
         'average_battery_level': round(avg_battery, 2),
         'task_status_counts': task_counts,
         'total_robots': sum(status_counts.values()),
         'total_tasks': sum(task_counts.values())
-    })
+    }), etag)
 
 if __name__ == '__main__':
+    init_db()
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
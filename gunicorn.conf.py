@@ -0,0 +1,13 @@
+# Gunicorn configuration for serving the robotics dashboard
+# Usage: gunicorn app:app
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+# Every endpoint is a thin SQLite proxy, so requests spend their time blocked
+# on I/O with the GIL released. Threaded workers overlap that waiting; keep one
+# thread per pooled connection (POOL_SIZE in app.py) so no request queues on
+# the pool.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "5"))
@@ -0,0 +1,58 @@
+"""
+Flask application launcher shared by the test runner and the test fixtures
+Starts the app in its own interpreter and polls it until it answers
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def app_main(port=5000):
+    """Child process entry point: initialize the database and serve the app"""
+    sys.path.insert(0, PROJECT_ROOT)
+    import app
+    
+    app.init_db()
+    app.app.run(host="0.0.0.0", port=port, use_reloader=False)
+
+def spawn_app(port=5000, database=None):
+    """Start the Flask application in a child process and return the process"""
+    env = os.environ.copy()
+    if database:
+        env["DATABASE_PATH"] = database
+    # Request logs go nowhere: an unread pipe would eventually fill up and
+    # block the server
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), str(port)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+def is_serving(url):
+    """Single probe: True if url answers 200 OK right now"""
+    import requests
+    
+    try:
+        return requests.get(url, timeout=0.2).status_code == 200
+    except requests.RequestException:
+        return False
+
+def wait_ready(url, timeout=15):
+    """Poll url until it answers 200 OK; False if it never does within timeout"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if is_serving(url):
+            return True
+        # Back off while the socket is still refusing connections
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+    return False
+
+if __name__ == "__main__":
+    app_main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
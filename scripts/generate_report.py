@@ -5,12 +5,68 @@ This script generates a comprehensive report combining all test results
 """
 
 import os
+import gzip
 import json
-import glob
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-import xml.etree.ElementTree as ET
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:  # the report job may run without requirements installed
+    import xml.etree.ElementTree as etree
+    HAS_LXML = False
+
+def iter_elements(path, tag, event="end"):
+    """Yield the `tag` elements of an XML file as the parser reaches them"""
+    if HAS_LXML:
+        # libxml2 matches the tag itself; other elements never reach Python
+        for _, elem in etree.iterparse(path, events=(event,), tag=tag):
+            yield elem
+    else:
+        for _, elem in etree.iterparse(path, events=(event,)):
+            if elem.tag == tag:
+                yield elem
+
+# One row of the "Test Suite Breakdown" table
+SUITE_ROW_TEMPLATE = """
+                    <tr>
+                        <td>{name}</td>
+                        <td>{tests}</td>
+                        <td class="status-passed">{passed}</td>
+                        <td class="status-failed">{failed}</td>
+                        <td class="status-skipped">{skipped}</td>
+                        <td>{time:.2f}</td>
+                    </tr>
+            """
+
+REPORT_FOOTER = """
+                </table>
+            </div>
+        </div>
+        
+        <div class="footer">
+            <p>🤖 Robotics Dashboard Test Automation Framework</p>
+            <p>Built with ❤️ for the Robotics Community</p>
+        </div>
+    </div>
+</body>
+</html>
+        """
+
+def link_or_copy(src, dst):
+    """Hard-link a report file, copying it when links are not possible"""
+    try:
+        os.link(src, dst)
+    except OSError:  # e.g. artifacts on another filesystem
+        shutil.copy2(src, dst)
 
 class TestReportGenerator:
     """Generate comprehensive test reports"""
@@ -24,15 +80,32 @@ class TestReportGenerator:
         # Create report directory
         os.makedirs(self.report_dir, exist_ok=True)
         
+        # List test_reports once instead of stat()-ing each expected file
+        try:
+            with os.scandir(self.test_reports_dir) as entries:
+                self._present = {entry.name for entry in entries}
+        except FileNotFoundError:
+            self._present = set()
+        
     def generate_comprehensive_report(self):
         """Generate the main comprehensive report"""
         print("📊 Generating comprehensive test report...")
         
-        # Collect all test results
-        test_results = self.collect_test_results()
-        coverage_data = self.collect_coverage_data()
-        performance_data = self.collect_performance_data()
-        security_data = self.collect_security_data()
+        # Collect all test results; the collectors read disjoint files, so
+        # run them side by side
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(collect)
+                for collect in (
+                    self.collect_test_results,
+                    self.collect_coverage_data,
+                    self.collect_performance_data,
+                    self.collect_security_data
+                )
+            ]
+        test_results, coverage_data, performance_data, security_data = (
+            future.result() for future in futures
+        )
         
         # Generate HTML report
         self.generate_html_report(test_results, coverage_data, performance_data, security_data)
@@ -58,12 +131,11 @@ class TestReportGenerator:
         
         # Parse JUnit XML
         junit_file = os.path.join(self.test_reports_dir, "junit.xml")
-        if os.path.exists(junit_file):
+        if "junit.xml" in self._present:
             try:
-                tree = ET.parse(junit_file)
-                root = tree.getroot()
-                
-                for testsuite in root.findall(".//testsuite"):
+                # Stream the file and drop each suite once counted, so memory
+                # stays flat no matter how many testcases the report holds
+                for testsuite in iter_elements(junit_file, "testsuite"):
                     suite_data = {
                         "name": testsuite.get("name", "Unknown"),
                         "tests": int(testsuite.get("tests", 0)),
@@ -72,6 +144,7 @@ class TestReportGenerator:
                         "skipped": int(testsuite.get("skipped", 0)),
                         "time": float(testsuite.get("time", 0))
                     }
+                    testsuite.clear()
                     
                     results["test_suites"].append(suite_data)
                     results["total_tests"] += suite_data["tests"]
@@ -97,18 +170,16 @@ class TestReportGenerator:
         
         # Parse coverage XML
         coverage_file = os.path.join(self.test_reports_dir, "coverage.xml")
-        if os.path.exists(coverage_file):
+        if "coverage.xml" in self._present:
             try:
-                tree = ET.parse(coverage_file)
-                root = tree.getroot()
-                
-                # Get overall coverage
-                coverage_elem = root.find(".//coverage")
-                if coverage_elem is not None:
+                # Overall rates live on the root <coverage> element, so stop
+                # reading as soon as it opens
+                for coverage_elem in iter_elements(coverage_file, "coverage", event="start"):
                     coverage["total_coverage"] = float(coverage_elem.get("line-rate", 0)) * 100
                     coverage["line_coverage"] = float(coverage_elem.get("line-rate", 0)) * 100
                     coverage["branch_coverage"] = float(coverage_elem.get("branch-rate", 0)) * 100
                     coverage["function_coverage"] = float(coverage_elem.get("function-rate", 0)) * 100
+                    break
                     
             except Exception as e:
                 print(f"⚠️ Error parsing coverage XML: {e}")
@@ -126,7 +197,7 @@ class TestReportGenerator:
         
         # Parse performance report
         perf_file = os.path.join(self.test_reports_dir, "performance-report.html")
-        if os.path.exists(perf_file):
+        if "performance-report.html" in self._present:
             try:
                 with open(perf_file, 'r', encoding='utf-8') as f:
                     content = f.read()
@@ -153,7 +224,7 @@ class TestReportGenerator:
         
         # Parse security scan results
         bandit_file = os.path.join(self.test_reports_dir, "security-scan.json")
-        if os.path.exists(bandit_file):
+        if "security-scan.json" in self._present:
             try:
                 with open(bandit_file, 'r') as f:
                     data = json.load(f)
@@ -173,7 +244,7 @@ class TestReportGenerator:
     
     def generate_html_report(self, test_results, coverage_data, performance_data, security_data):
         """Generate comprehensive HTML report"""
-        html_content = f"""
+        header = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -452,38 +523,24 @@ class TestReportGenerator:
                     </tr>
         """
         
-        # Add test suite details
-        for suite in test_results['test_suites']:
-            passed = suite['tests'] - suite['failures'] - suite['errors'] - suite['skipped']
-            html_content += f"""
-                    <tr>
-                        <td>{suite['name']}</td>
-                        <td>{suite['tests']}</td>
-                        <td class="status-passed">{passed}</td>
-                        <td class="status-failed">{suite['failures'] + suite['errors']}</td>
-                        <td class="status-skipped">{suite['skipped']}</td>
-                        <td>{suite['time']:.2f}</td>
-                    </tr>
-            """
-        
-        html_content += """
-                </table>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p>🤖 Robotics Dashboard Test Automation Framework</p>
-            <p>Built with ❤️ for the Robotics Community</p>
-        </div>
-    </div>
-</body>
-</html>
-        """
+        rows = "".join(
+            SUITE_ROW_TEMPLATE.format(
+                passed=suite['tests'] - suite['failures'] - suite['errors'] - suite['skipped'],
+                failed=suite['failures'] + suite['errors'],
+                **suite
+            )
+            for suite in test_results['test_suites']
+        )
         
         # Write HTML report
         report_file = os.path.join(self.report_dir, "comprehensive_report.html")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # plus a precompressed copy that web servers can serve as-is
+        # (e.g. nginx gzip_static)
+        with open(report_file, 'w', encoding='utf-8') as f, \
+                gzip.open(report_file + '.gz', 'wt', encoding='utf-8', compresslevel=6) as gz:
+            for chunk in (header, rows, REPORT_FOOTER):
+                f.write(chunk)
+                gz.write(chunk)
         
         print(f"✅ HTML report generated: {report_file}")
     
@@ -508,8 +565,12 @@ class TestReportGenerator:
         
         # Write JSON summary
         summary_file = os.path.join(self.report_dir, "test_summary.json")
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        if orjson is not None:
+            with open(summary_file, 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(summary_file, 'w') as f:
+                json.dump(summary, f, indent=2)
         
         print(f"✅ JSON summary generated: {summary_file}")
     
@@ -520,24 +581,24 @@ class TestReportGenerator:
         
         # Copy HTML report
         html_source = os.path.join(self.test_reports_dir, "report.html")
-        if os.path.exists(html_source):
+        if "report.html" in self._present:
             shutil.copy2(html_source, detailed_dir)
         
         # Copy coverage report
         coverage_source = os.path.join(self.test_reports_dir, "coverage")
-        if os.path.exists(coverage_source):
+        if "coverage" in self._present:
             coverage_dest = os.path.join(detailed_dir, "coverage")
             if os.path.exists(coverage_dest):
                 shutil.rmtree(coverage_dest)
-            shutil.copytree(coverage_source, coverage_dest)
+            shutil.copytree(coverage_source, coverage_dest, copy_function=link_or_copy)
         
         # Copy Allure report
         allure_source = os.path.join(self.test_reports_dir, "allure-report")
-        if os.path.exists(allure_source):
+        if "allure-report" in self._present:
             allure_dest = os.path.join(detailed_dir, "allure-report")
             if os.path.exists(allure_dest):
                 shutil.rmtree(allure_dest)
-            shutil.copytree(allure_source, allure_dest)
+            shutil.copytree(allure_source, allure_dest, copy_function=link_or_copy)
         
         print(f"✅ Detailed reports copied to: {detailed_dir}")
 
@@ -4,21 +4,26 @@ Test Runner Script for Robotics Dashboard Test Automation
 This script provides an easy way to run different types of tests
 """
 
+import atexit
 import os
 import sys
 import subprocess
 import argparse
-import time
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors"""
+from _launcher import is_serving, spawn_app, wait_ready
+
+def run_command(command, description, stream=False):
+    """Run a command and handle errors; stream=True writes straight to the terminal"""
     print(f"\n🚀 {description}")
     print(f"Command: {' '.join(command)}")
     print("-" * 60)
     
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        # Streaming leaves stdout/stderr as None so the child inherits our fds
+        result = subprocess.run(command, check=True, capture_output=not stream, text=True)
         print("✅ Command completed successfully")
         if result.stdout:
             print("Output:", result.stdout)
@@ -39,12 +44,16 @@ def check_dependencies():
         "selenium", "pytest", "flask", "requests", "webdriver-manager"
     ]
     
-    missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
-        except ImportError:
-            missing_packages.append(package)
+    # find_spec only locates each package; importing them would run all of
+    # Selenium's and Flask's module-level code just to check presence. The
+    # lookups are stat-bound, so they run side by side on a thread pool.
+    module_names = [package.replace("-", "_") for package in required_packages]
+    with ThreadPoolExecutor(max_workers=len(module_names)) as executor:
+        specs = list(executor.map(importlib.util.find_spec, module_names))
+    missing_packages = [
+        package for package, spec in zip(required_packages, specs)
+        if spec is None
+    ]
     
     if missing_packages:
         print(f"❌ Missing packages: {', '.join(missing_packages)}")
@@ -59,44 +68,29 @@ def start_application():
     print("🚀 Starting Flask application...")
     
     # Check if app is already running
-    try:
-        import requests
-        response = requests.get("http://localhost:5000/api/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ Application is already running")
-            return True
-    except:
-        pass
+    if is_serving("http://localhost:5000/api/health"):
+        print("✅ Application is already running")
+        return True
     
     # Start the application
     try:
-        process = subprocess.Popen(
-            ["python", "app.py"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        process = spawn_app()
+        # The app is a separate interpreter; stop it when the runner exits
+        atexit.register(process.terminate)
         
         # Wait for app to start
-        time.sleep(5)
-        
-        # Check if it's running
-        try:
-            response = requests.get("http://localhost:5000/api/health", timeout=10)
-            if response.status_code == 200:
-                print("✅ Application started successfully")
-                return True
-            else:
-                print("❌ Application failed to start properly")
-                return False
-        except Exception as e:
-            print(f"❌ Application not accessible: {e}")
+        if wait_ready("http://localhost:5000/api/health"):
+            print("✅ Application started successfully")
+            return True
+        else:
+            print("❌ Application not accessible")
             return False
             
     except Exception as e:
         print(f"❌ Failed to start application: {e}")
         return False
 
-def run_tests(test_type, browser="chrome", headless=False, parallel=False):
+def run_tests(test_type, browser="chrome", headless=False, workers="auto", coverage=False):
     """Run tests based on type"""
     print(f"\n🧪 Running {test_type} tests...")
     
@@ -110,22 +104,39 @@ def run_tests(test_type, browser="chrome", headless=False, parallel=False):
     env["BROWSER"] = browser
     env["HEADLESS"] = str(headless).lower()
     
-    # Build pytest command
+    # Build pytest command. Under xdist the HTML and JUnit reports are written
+    # by the controller process alone (workers only forward their results),
+    # and allure gives every test its own file, so the paths stay shared.
     cmd = [
         "python", "-m", "pytest",
         "-v",
         "--tb=short",
         "--html=test_reports/report.html",
         "--self-contained-html",
-        "--cov=app",
-        "--cov-report=html:test_reports/coverage",
-        "--cov-report=term-missing",
         "--junitxml=test_reports/junit.xml",
-        "--alluredir=test_reports/allure-results"
+        "--alluredir=test_reports/allure-results",
+        # Fail a hung test (e.g. a browser that stopped answering) instead of
+        # stalling its worker; the limit sits above the longest legitimate
+        # path of browser start-up, a refresh wait and a 20s explicit wait.
+        # The method is left to pytest-timeout: SIGALRM where available,
+        # which fails just that test, whereas the thread method would exit
+        # the process before the reports above are written
+        "--timeout=60"
     ]
     
-    if parallel:
-        cmd.extend(["-n", "auto"])
+    # Coverage tracing slows every call, so it is only collected on request
+    if coverage:
+        cmd.extend([
+            "--cov=app",
+            "--cov-report=html:test_reports/coverage",
+            "--cov-report=term-missing"
+        ])
+    
+    # Spread tests over pytest-xdist workers; 0 runs serially. Each browser
+    # test class carries an xdist_group so it stays on one worker and shares
+    # that worker's browser session, as do the state-changing API tests,
+    # while the remaining API tests are spread one by one.
+    cmd.extend(["-n", str(workers), "--dist=loadgroup"])
     
     if test_type == "ui":
         cmd.extend(["tests/test_ui_dashboard.py", "-m", "ui"])
@@ -148,22 +159,23 @@ def run_tests(test_type, browser="chrome", headless=False, parallel=False):
         print(f"❌ Tests failed with exit code {e.returncode}")
         return False
 
-def generate_reports():
+def generate_reports(coverage=False):
     """Generate comprehensive test reports"""
     print("\n📊 Generating reports...")
     
     # Generate Allure report
     if run_command(["allure", "generate", "test_reports/allure-results", "--clean", "-o", "test_reports/allure-report"], 
-                   "Generating Allure report"):
+                   "Generating Allure report", stream=True):
         print("✅ Allure report generated")
     
     # Generate coverage report
-    if run_command(["python", "-m", "coverage", "report"], "Generating coverage report"):
+    if coverage and run_command(["python", "-m", "coverage", "report"], "Generating coverage report", stream=True):
         print("✅ Coverage report generated")
     
     print("\n📁 Reports generated in test_reports/ directory:")
     print("  - HTML Report: test_reports/report.html")
-    print("  - Coverage Report: test_reports/coverage/index.html")
+    if coverage:
+        print("  - Coverage Report: test_reports/coverage/index.html")
     print("  - Allure Report: test_reports/allure-report/index.html")
     print("  - JUnit XML: test_reports/junit.xml")
 
@@ -175,8 +187,10 @@ def main():
                        default="chrome", help="Browser to use for UI tests")
     parser.add_argument("--headless", action="store_true", 
                        help="Run browser in headless mode")
-    parser.add_argument("--parallel", action="store_true", 
-                       help="Run tests in parallel")
+    parser.add_argument("--workers", default=os.environ.get("PYTEST_WORKERS", "auto"),
+                       help="Number of parallel pytest-xdist workers (0 runs serially)")
+    parser.add_argument("--coverage", action="store_true", 
+                       help="Collect code coverage for app.py (slower)")
     parser.add_argument("--no-start-app", action="store_true", 
                        help="Don't start the Flask application")
     parser.add_argument("--reports-only", action="store_true", 
@@ -188,7 +202,7 @@ def main():
     print("=" * 50)
     
     if args.reports_only:
-        generate_reports()
+        generate_reports(args.coverage)
         return
     
     # Check dependencies
@@ -202,12 +216,12 @@ def main():
             sys.exit(1)
     
     # Run tests
-    if not run_tests(args.type, args.browser, args.headless, args.parallel):
+    if not run_tests(args.type, args.browser, args.headless, args.workers, args.coverage):
         print("❌ Tests failed. Exiting.")
         sys.exit(1)
     
     # Generate reports
-    generate_reports()
+    generate_reports(args.coverage)
     
     print("\n🎉 Test execution completed successfully!")
     print("Check the test_reports/ directory for detailed results.")
@@ -1,6 +1,10 @@
 import pytest
+import orjson
 import os
+import shutil
+import sqlite3
 import sys
+import tempfile
 import time
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -9,15 +13,63 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Keep downloaded drivers in ./.wdm (cached by CI) instead of the user's home
+os.environ.setdefault("WDM_LOCAL", "1")
+
+class _OrjsonCompat:
+    """Stand-in for the json module inside requests, backed by orjson"""
+    @staticmethod
+    def loads(s, **kwargs):
+        # Malformed bodies must still raise the exception requests documents
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos) from e
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # requests passes allow_nan=False; orjson already writes NaN as null
+        return orjson.dumps(obj).decode()
+
+# Response.json() and json= request bodies go through orjson in every test
+requests.models.complexjson = _OrjsonCompat
 
 # Configuration
-BASE_URL = "http://localhost:5000"
-API_BASE_URL = "http://localhost:5000/api"
+WORKER_ID = os.getenv("PYTEST_XDIST_WORKER", "gw0")
+# Each pytest-xdist worker talks to its own app process (gw0 -> 5000,
+# gw1 -> 5001, ...); APP_PORT pins every worker to one server instead
+APP_PORT = int(os.getenv("APP_PORT", 5000 + int(WORKER_ID[2:])))
+# ...backed by its own SQLite file, so robots created on one worker never
+# shift the counts another worker asserts on. Serial runs keep the default.
+APP_DATABASE = (
+    f"robotics_dashboard_{WORKER_ID}.db" if "PYTEST_XDIST_WORKER" in os.environ else None
+)
+# SQLite file behind this worker's app, resolved like the app resolves it
+APP_DATABASE_FILE = os.path.join(
+    PROJECT_ROOT, APP_DATABASE or os.getenv("DATABASE_PATH", "robotics_dashboard.db")
+)
+# More readings than /api/sensor-data returns at most (SENSOR_DATA_LIMIT)
+SENSOR_SEED_ROWS = 150
+BASE_URL = f"http://localhost:{APP_PORT}"
+API_BASE_URL = f"{BASE_URL}/api"
 BROWSER = os.getenv("BROWSER", "chrome")
 HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
+# One screenshot directory per pytest-xdist worker so parallel runs never race
+SCREENSHOT_DIR = os.path.join("test_screenshots", WORKER_ID)
+# Dedicated Chrome profile per test process, so the HTTP cache persists
+# between page loads without two browsers locking the same profile
+CHROME_PROFILE_DIR = os.path.join(tempfile.gettempdir(), f"chrome-profile-{os.getpid()}")
+# Opt-in memoization of api_client GETs, for runs that only check response
+# shapes. Off by default: writes made through the UI or by other xdist
+# workers cannot invalidate it.
+API_CACHE = os.getenv("API_CACHE", "false").lower() == "true"
 
 @pytest.fixture(scope="session")
 def setup_database():
@@ -28,28 +80,24 @@ def setup_database():
 @pytest.fixture(scope="session")
 def start_application():
     """Start the Flask application for testing"""
-    import subprocess
-    import time
+    from scripts._launcher import is_serving, spawn_app, wait_ready
+    
+    # Reuse an app that is already serving (started by run_tests.py, CI or
+    # another xdist worker) rather than racing it for the port. One probe is
+    # enough: a free port refuses at once, so polling would only delay a cold
+    # start
+    if is_serving(f"{BASE_URL}/api/health"):
+        yield None
+        return
     
     # Start the Flask app
-    process = subprocess.Popen(
-        ["python", "app.py"],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
+    process = spawn_app(APP_PORT, APP_DATABASE)
     
     # Wait for app to start
-    time.sleep(5)
-    
-    # Check if app is running
-    try:
-        response = requests.get(f"{BASE_URL}/api/health", timeout=10)
-        if response.status_code == 200:
-            print("✅ Application started successfully")
-        else:
-            print("❌ Application failed to start properly")
-    except Exception as e:
-        print(f"❌ Application not accessible: {e}")
+    if wait_ready(f"{BASE_URL}/api/health"):
+        print("✅ Application started successfully")
+    else:
+        print("❌ Application not accessible")
     
     yield process
     
@@ -57,68 +105,188 @@ def start_application():
     process.terminate()
     process.wait()
 
-@pytest.fixture(scope="function")
-def driver():
-    """Setup and teardown WebDriver for each test"""
+@pytest.fixture(scope="session")
+def app_url():
+    """Base URL of the app serving this worker"""
+    return BASE_URL
+
+@pytest.fixture(scope="session")
+def chromedriver_path():
+    """Resolve the ChromeDriver binary once per test session"""
+    return ChromeDriverManager().install()
+
+@pytest.fixture(scope="session")
+def _browser(chromedriver_path):
+    """Single WebDriver shared by every UI test in the session"""
     if BROWSER.lower() == "chrome":
         chrome_options = Options()
         if HEADLESS:
-            chrome_options.add_argument("--headless")
+            # New headless mode runs the full browser without a window; GPU
+            # compositing is only needed with a display
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument(f"--user-data-dir={CHROME_PROFILE_DIR}")
+        # driver.get() returns at DOMContentLoaded instead of waiting for every
+        # image and font; tests wait for the specific elements they need
+        chrome_options.page_load_strategy = "eager"
+        # Tests assert on text and DOM structure only; skip image and web
+        # font downloads
+        chrome_options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-remote-fonts")
         
-        service = Service(ChromeDriverManager().install())
+        service = Service(chromedriver_path)
         driver = webdriver.Chrome(service=service, options=chrome_options)
     else:
         raise ValueError(f"Unsupported browser: {BROWSER}")
     
-    driver.implicitly_wait(10)
-    driver.maximize_window()
+    # No implicit wait by default: element waits go through the explicit
+    # `wait` fixture (TestDashboardUI turns one on for its own tests)
+    driver.implicitly_wait(0)
+    if not HEADLESS:
+        # Headless windows are already sized by --window-size
+        driver.maximize_window()
     
     yield driver
     
+    driver.quit()
+    shutil.rmtree(CHROME_PROFILE_DIR, ignore_errors=True)
+
+@pytest.fixture(scope="function")
+def driver(_browser, request):
+    """Hand the shared browser to a test and reset its state afterwards"""
+    yield _browser
+    
     # Take screenshot on test failure
-    if hasattr(pytest, '_test_failed') and pytest._test_failed:
+    rep_call = getattr(request.node, "rep_call", None)
+    failed = rep_call is not None and rep_call.failed
+    if failed:
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        screenshot_path = f"test_screenshots/failure_{timestamp}.png"
-        os.makedirs("test_screenshots", exist_ok=True)
-        driver.save_screenshot(screenshot_path)
+        screenshot_path = os.path.join(SCREENSHOT_DIR, f"failure_{timestamp}.png")
+        os.makedirs(SCREENSHOT_DIR, exist_ok=True)
+        _browser.save_screenshot(screenshot_path)
         print(f"📸 Screenshot saved: {screenshot_path}")
     
-    driver.quit()
+    # Leave a clean browser for the next test (storage is not reachable on
+    # pages without an origin, hence the try)
+    _browser.execute_script(
+        "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+    )
+    _browser.delete_all_cookies()
+    
+    # Keep a healthy page loaded so the next test can reuse it; a failed test
+    # may have left it in any state, so drop it
+    if failed:
+        _browser.get("about:blank")
 
-@pytest.fixture(scope="function")
-def wait(driver):
-    """WebDriverWait instance for explicit waits"""
-    return WebDriverWait(driver, 20)
+@pytest.fixture(scope="session")
+def wait(_browser):
+    """WebDriverWait instance for explicit waits on the shared browser"""
+    # Poll every 100ms rather than the default 500ms; the app is local and
+    # most conditions are met well within one default interval
+    return WebDriverWait(_browser, 20, poll_frequency=0.1)
 
-@pytest.fixture(scope="function")
-def api_client():
-    """API client for testing REST endpoints"""
+@pytest.fixture(scope="session")
+def api_client(start_application):
+    """API client for testing REST endpoints, shared by the whole session"""
     class APIClient:
         def __init__(self, base_url):
             self.base_url = base_url
             self.session = requests.Session()
+            # Keep-alive pool so tests reuse connections instead of
+            # reconnecting for every request
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.1)
+            )
+            self.session.mount("http://", adapter)
+            self.session.headers["Connection"] = "keep-alive"
+            self._cache = {}
+            # Headers of the first successful GET /robots response, captured
+            # as it passes so header checks need no request of their own.
+            # Pinned to one endpoint so the check does not depend on which
+            # request a worker happened to send first.
+            self.api_headers = None
+            self.session.hooks["response"].append(self._capture_headers)
+        
+        def _capture_headers(self, response, *args, **kwargs):
+            if response.status_code == 200 and response.url == f"{self.base_url}/robots":
+                self.api_headers = response.headers
+                try:
+                    self.session.hooks["response"].remove(self._capture_headers)
+                except ValueError:
+                    pass  # Already removed by a concurrent response
         
         def get(self, endpoint, params=None):
-            return self.session.get(f"{self.base_url}{endpoint}", params=params)
+            if not API_CACHE:
+                return self.session.get(f"{self.base_url}{endpoint}", params=params)
+            key = (endpoint, frozenset((params or {}).items()))
+            if key not in self._cache:
+                self._cache[key] = self.session.get(f"{self.base_url}{endpoint}", params=params)
+            return self._cache[key]
         
         def post(self, endpoint, data=None, json=None):
+            self._cache.clear()
             return self.session.post(f"{self.base_url}{endpoint}", data=data, json=json)
         
         def put(self, endpoint, data=None, json=None):
+            self._cache.clear()
             return self.session.put(f"{self.base_url}{endpoint}", data=data, json=json)
         
         def delete(self, endpoint):
+            self._cache.clear()
             return self.session.delete(f"{self.base_url}{endpoint}")
+        
+        def get_raw(self, url):
+            # Absolute URL, for pages outside the API prefix
+            return self.session.get(url)
     
-    return APIClient(API_BASE_URL)
+    client = APIClient(API_BASE_URL)
+    yield client
+    client.session.close()
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
+def any_robot_id(api_client):
+    """ID of an existing robot, looked up once per session"""
+    response = api_client.get("/robots")
+    assert response.status_code == 200
+    robots = response.json()["robots"]
+    assert robots
+    return robots[0]["id"]
+
+@pytest.fixture(scope="session")
+def sensor_readings(any_robot_id):
+    """Seed SENSOR_SEED_ROWS readings for any_robot_id and return that robot's ID"""
+    # The app seeds no sensor data, and there is no endpoint to post any, so
+    # the readings go straight into the database the app serves
+    conn = sqlite3.connect(APP_DATABASE_FILE, timeout=10)
+    with conn:
+        existing = conn.execute(
+            "SELECT COUNT(*) FROM sensor_data WHERE robot_id = ?", (any_robot_id,)
+        ).fetchone()[0]
+        conn.executemany(
+            "INSERT INTO sensor_data (robot_id, sensor_type, value) VALUES (?, 'temperature', ?)",
+            [(any_robot_id, 20.0 + i % 10) for i in range(SENSOR_SEED_ROWS - existing)]
+        )
+    conn.close()
+    return any_robot_id
+
+@pytest.fixture(scope="module")
+def robots_snapshot(api_client):
+    """Robots list fetched once per module, for tests that only read it"""
+    response = api_client.get("/robots")
+    assert response.status_code == 200
+    return response.json()["robots"]
+
+@pytest.fixture(scope="session")
 def test_data():
-    """Test data for various test scenarios"""
+    """Test data for various test scenarios (shared; tests must not mutate it)"""
     return {
         "robot": {
             "name": "TestBot-001",
@@ -145,7 +313,5 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     rep = outcome.get_result()
     
-    if rep.when == "call" and rep.failed:
-        pytest._test_failed = True
-    else:
-        pytest._test_failed = False 
\ No newline at end of file
+    # Per-item report for each phase (rep_setup, rep_call, rep_teardown)
+    setattr(item, "rep_" + rep.when, rep) 
\ No newline at end of file
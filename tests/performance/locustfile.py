@@ -1,6 +1,31 @@
 from locust import HttpUser, task, between
-import json
+from locust.contrib.fasthttp import FastHttpUser
+import orjson
 import random
+import time
+
+ROBOT_IDS_TTL = 10  # seconds before the cached robot IDs are refreshed
+PAYLOAD_RING_SIZE = 1024  # power of two so the ring index can be masked
+PAYLOAD_RING_MASK = PAYLOAD_RING_SIZE - 1
+_DASH_MARK = b"Robotics Control Dashboard"  # matched against raw bytes, no decode
+_STATS_REQUIRED = frozenset({"total_robots", "average_battery_level", "total_tasks"})
+
+def make_random_robot(prefix="PerfBot"):
+    """Random robot creation payload"""
+    return {
+        "name": f"{prefix}-{random.randint(1000, 9999)}",
+        "status": random.choice(["idle", "active", "maintenance"]),
+        "battery_level": random.randint(20, 100),
+        "location": random.choice(["Lab A", "Warehouse B", "Production Line"])
+    }
+
+def make_random_update():
+    """Random robot update payload"""
+    return {
+        "status": random.choice(["idle", "active", "maintenance"]),
+        "battery_level": random.randint(20, 100),
+        "location": random.choice(["Updated Lab", "New Warehouse", "Maintenance Bay"])
+    }
 
 class RoboticsDashboardUser(HttpUser):
     """Performance test user for Robotics Dashboard"""
@@ -13,6 +38,37 @@ class RoboticsDashboardUser(HttpUser):
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        self._prepare_payloads()
+        self._refresh_robot_ids()
+    
+    def _prepare_payloads(self):
+        """Precompute ring buffers of request payloads"""
+        self._payloads = [make_random_robot() for _ in range(PAYLOAD_RING_SIZE)]
+        self._upd_payloads = [make_random_update() for _ in range(PAYLOAD_RING_SIZE)]
+        self._i = 0
+    
+    def _next_index(self):
+        """Current ring buffer slot; advances the ring"""
+        i = self._i
+        self._i = (i + 1) & PAYLOAD_RING_MASK
+        return i
+    
+    def _refresh_robot_ids(self):
+        """Reload the cached robot IDs from the robots list"""
+        self._robot_ids = []
+        self._robot_ids_at = time.monotonic()
+        robots_response = self.client.get("/api/robots")
+        if robots_response.status_code == 200:
+            robots = orjson.loads(robots_response.content).get("robots", [])
+            self._robot_ids = [robot["id"] for robot in robots]
+    
+    def _get_robot_id(self):
+        """Random known robot ID, refreshing the cache when stale or empty"""
+        if not self._robot_ids or time.monotonic() - self._robot_ids_at > ROBOT_IDS_TTL:
+            self._refresh_robot_ids()
+        if self._robot_ids:
+            return random.choice(self._robot_ids)
+        return None
     
     @task(3)
     def get_health_check(self):
@@ -28,7 +84,7 @@ class RoboticsDashboardUser(HttpUser):
         """Test getting robots list - very high frequency"""
         with self.client.get("/api/robots", catch_response=True) as response:
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if "robots" in data and isinstance(data["robots"], list):
                     response.success()
                 else:
@@ -41,9 +97,8 @@ class RoboticsDashboardUser(HttpUser):
         """Test getting dashboard statistics - medium frequency"""
         with self.client.get("/api/stats", catch_response=True) as response:
             if response.status_code == 200:
-                data = response.json()
-                required_fields = ["total_robots", "average_battery_level", "total_tasks"]
-                if all(field in data for field in required_fields):
+                data = orjson.loads(response.content)
+                if _STATS_REQUIRED <= data.keys():
                     response.success()
                 else:
                     response.failure("Missing required fields")
@@ -53,18 +108,13 @@ class RoboticsDashboardUser(HttpUser):
     @task(1)
     def create_robot(self):
         """Test creating a robot - low frequency"""
-        robot_data = {
-            "name": f"PerfBot-{random.randint(1000, 9999)}",
-            "status": random.choice(["idle", "active", "maintenance"]),
-            "battery_level": random.randint(20, 100),
-            "location": random.choice(["Lab A", "Warehouse B", "Production Line"])
-        }
+        robot_data = self._payloads[self._next_index()]
         
         with self.client.post("/api/robots", 
                              json=robot_data, 
                              catch_response=True) as response:
             if response.status_code == 201:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if "id" in data and "message" in data:
                     response.success()
                 else:
@@ -75,61 +125,49 @@ class RoboticsDashboardUser(HttpUser):
     @task(1)
     def get_robot_by_id(self):
         """Test getting robot by ID - low frequency"""
-        # First get a robot ID from the list
-        robots_response = self.client.get("/api/robots")
-        if robots_response.status_code == 200:
-            robots = robots_response.json().get("robots", [])
-            if robots:
-                robot_id = random.choice(robots)["id"]
-                
-                with self.client.get(f"/api/robots/{robot_id}", 
-                                   catch_response=True) as response:
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "id" in data and "name" in data:
-                            response.success()
-                        else:
-                            response.failure("Invalid robot data")
-                    else:
-                        response.failure(f"Expected 200, got {response.status_code}")
+        robot_id = self._get_robot_id()
+        if robot_id is None:
+            # No robots available, skip this test
+            return
+        
+        with self.client.get(f"/api/robots/{robot_id}", 
+                           catch_response=True) as response:
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if "id" in data and "name" in data:
+                    response.success()
+                else:
+                    response.failure("Invalid robot data")
             else:
-                # No robots available, skip this test
-                pass
+                response.failure(f"Expected 200, got {response.status_code}")
     
     @task(1)
     def update_robot(self):
         """Test updating a robot - low frequency"""
-        # First get a robot ID from the list
-        robots_response = self.client.get("/api/robots")
-        if robots_response.status_code == 200:
-            robots = robots_response.json().get("robots", [])
-            if robots:
-                robot_id = random.choice(robots)["id"]
-                
-                update_data = {
-                    "status": random.choice(["idle", "active", "maintenance"]),
-                    "battery_level": random.randint(20, 100),
-                    "location": random.choice(["Updated Lab", "New Warehouse", "Maintenance Bay"])
-                }
-                
-                with self.client.put(f"/api/robots/{robot_id}", 
-                                   json=update_data, 
-                                   catch_response=True) as response:
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "message" in data:
-                            response.success()
-                        else:
-                            response.failure("Invalid response format")
-                    else:
-                        response.failure(f"Expected 200, got {response.status_code}")
+        robot_id = self._get_robot_id()
+        if robot_id is None:
+            return
+        
+        update_data = self._upd_payloads[self._next_index()]
+        
+        with self.client.put(f"/api/robots/{robot_id}", 
+                           json=update_data, 
+                           catch_response=True) as response:
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if "message" in data:
+                    response.success()
+                else:
+                    response.failure("Invalid response format")
+            else:
+                response.failure(f"Expected 200, got {response.status_code}")
     
     @task(2)
     def get_tasks_list(self):
         """Test getting tasks list - medium frequency"""
         with self.client.get("/api/tasks", catch_response=True) as response:
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if "tasks" in data and isinstance(data["tasks"], list):
                     response.success()
                 else:
@@ -142,7 +180,7 @@ class RoboticsDashboardUser(HttpUser):
         """Test getting sensor data - low frequency"""
         with self.client.get("/api/sensor-data", catch_response=True) as response:
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if "sensor_data" in data and isinstance(data["sensor_data"], list):
                     response.success()
                 else:
@@ -153,40 +191,47 @@ class RoboticsDashboardUser(HttpUser):
     @task(1)
     def get_sensor_data_by_robot(self):
         """Test getting sensor data filtered by robot - low frequency"""
-        # First get a robot ID from the list
-        robots_response = self.client.get("/api/robots")
-        if robots_response.status_code == 200:
-            robots = robots_response.json().get("robots", [])
-            if robots:
-                robot_id = random.choice(robots)["id"]
-                
-                with self.client.get(f"/api/sensor-data?robot_id={robot_id}", 
-                                   catch_response=True) as response:
-                    if response.status_code == 200:
-                        data = response.json()
-                        if "sensor_data" in data:
-                            response.success()
-                        else:
-                            response.failure("Invalid response format")
-                    else:
-                        response.failure(f"Expected 200, got {response.status_code}")
+        robot_id = self._get_robot_id()
+        if robot_id is None:
+            return
+        
+        with self.client.get(f"/api/sensor-data?robot_id={robot_id}", 
+                           catch_response=True) as response:
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if "sensor_data" in data:
+                    response.success()
+                else:
+                    response.failure("Invalid response format")
+            else:
+                response.failure(f"Expected 200, got {response.status_code}")
     
     @task(1)
     def test_dashboard_page(self):
         """Test loading the main dashboard page - low frequency"""
         with self.client.get("/", catch_response=True) as response:
             if response.status_code == 200:
-                if "Robotics Control Dashboard" in response.text:
+                if _DASH_MARK in response.content:
                     response.success()
                 else:
                     response.failure("Dashboard content not found")
             else:
                 response.failure(f"Expected 200, got {response.status_code}")
 
-class HighLoadUser(RoboticsDashboardUser):
+class HighLoadUser(FastHttpUser, RoboticsDashboardUser):
     """High load user for stress testing"""
     
     wait_time = between(0.1, 0.5)  # Very fast requests
+    # geventhttpclient session: FastHttpUser comes first so its client wins
+    default_headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    
+    def on_start(self):
+        """Setup user session (headers come from default_headers)"""
+        self._prepare_payloads()
+        self._refresh_robot_ids()
     
     @task(10)
     def rapid_health_checks(self):
@@ -209,6 +254,16 @@ class APIOnlyUser(HttpUser):
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        self._payloads = [
+            {
+                "name": f"APIBot-{random.randint(1000, 9999)}",
+                "status": "idle",
+                "battery_level": 100,
+                "location": "API Test Lab"
+            }
+            for _ in range(PAYLOAD_RING_SIZE)
+        ]
+        self._i = 0
     
     @task(5)
     def api_health_check(self):
@@ -228,10 +283,6 @@ class APIOnlyUser(HttpUser):
     @task(1)
     def api_create_robot(self):
         """API create robot"""
-        robot_data = {
-            "name": f"APIBot-{random.randint(1000, 9999)}",
-            "status": "idle",
-            "battery_level": 100,
-            "location": "API Test Lab"
-        }
+        robot_data = self._payloads[self._i]
+        self._i = (self._i + 1) & PAYLOAD_RING_MASK
         self.client.post("/api/robots", json=robot_data) 
\ No newline at end of file
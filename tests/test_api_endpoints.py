@@ -1,6 +1,7 @@
 import pytest
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 class TestRoboticsAPI:
@@ -17,31 +18,40 @@ class TestRoboticsAPI:
         
         print("✅ Health check endpoint works correctly")
     
-    def test_get_robots_list(self, api_client):
-        """Test getting the list of all robots"""
-        response = api_client.get("/robots")
+    @pytest.mark.usefixtures("sensor_readings")
+    @pytest.mark.parametrize("endpoint,key,required_fields,non_empty,expected_count", [
+        ("/robots", "robots",
+         ["id", "name", "status", "battery_level", "location", "last_updated"], True, None),
+        ("/tasks", "tasks",
+         ["id", "robot_id", "task_type", "status", "priority", "created_at"], False, None),
+        ("/sensor-data?limit=1", "sensor_data",
+         ["id", "robot_id", "sensor_type", "value", "timestamp"], True, 1),
+    ], ids=["robots", "tasks", "sensor-data"])
+    def test_list_endpoint(self, api_client, endpoint, key, required_fields, non_empty, expected_count):
+        """Test getting the list of robots, tasks or sensor readings"""
+        response = api_client.get(endpoint)
         
         assert response.status_code == 200
         data = response.json()
-        assert "robots" in data
-        assert isinstance(data["robots"], list)
-        assert len(data["robots"]) > 0
-        
-        # Verify robot structure
-        first_robot = data["robots"][0]
-        required_fields = ["id", "name", "status", "battery_level", "location", "last_updated"]
-        for field in required_fields:
-            assert field in first_robot
+        assert key in data
+        assert isinstance(data[key], list)
+        if non_empty:
+            assert len(data[key]) > 0
+        if expected_count is not None:
+            assert len(data[key]) == expected_count
+        
+        # If there are items, verify their structure
+        if data[key] and required_fields:
+            first_item = data[key][0]
+            for field in required_fields:
+                assert field in first_item
         
-        print("✅ Get robots list endpoint works correctly")
+        print(f"✅ Get {endpoint} list endpoint works correctly")
     
-    def test_get_robot_by_id(self, api_client):
+    def test_get_robot_by_id(self, api_client, robots_snapshot):
         """Test getting a specific robot by ID"""
-        # First get the list to get a valid robot ID
-        robots_response = api_client.get("/robots")
-        assert robots_response.status_code == 200
-        
-        robots = robots_response.json()["robots"]
+        # Take a valid robot ID from the list
+        robots = robots_snapshot
         assert len(robots) > 0
         
         robot_id = robots[0]["id"]
@@ -67,6 +77,7 @@ class TestRoboticsAPI:
         
         print("✅ Get nonexistent robot returns proper error")
     
+    @pytest.mark.xdist_group("rw")
     def test_create_new_robot(self, api_client, test_data):
         """Test creating a new robot"""
         robot_data = test_data["robot"]
@@ -80,12 +91,9 @@ class TestRoboticsAPI:
         assert "id" in data
         assert isinstance(data["id"], int)
         
-        # Verify robot was created by fetching it
-        robot_id = data["id"]
-        get_response = api_client.get(f"/robots/{robot_id}")
-        assert get_response.status_code == 200
-        
-        created_robot = get_response.json()
+        # Verify the stored robot echoed back by the API
+        created_robot = data["robot"]
+        assert created_robot["id"] == data["id"]
         assert created_robot["name"] == robot_data["name"]
         assert created_robot["status"] == robot_data["status"]
         assert created_robot["battery_level"] == robot_data["battery_level"]
@@ -93,6 +101,7 @@ class TestRoboticsAPI:
         
         print("✅ Create robot endpoint works correctly")
     
+    @pytest.mark.xdist_group("rw")
     def test_create_robot_with_invalid_data(self, api_client, test_data):
         """Test creating a robot with invalid data"""
         invalid_data = test_data["invalid_robot"]
@@ -104,6 +113,7 @@ class TestRoboticsAPI:
         
         print("✅ Create robot with invalid data returns proper error")
     
+    @pytest.mark.xdist_group("rw")
     def test_update_robot(self, api_client, test_data):
         """Test updating an existing robot"""
         # First create a robot
@@ -119,17 +129,16 @@ class TestRoboticsAPI:
         data = response.json()
         assert data["message"] == "Robot updated successfully"
         
-        # Verify the update
-        get_response = api_client.get(f"/robots/{robot_id}")
-        assert get_response.status_code == 200
-        
-        updated_robot = get_response.json()
+        # Verify the update from the row echoed back by the API
+        updated_robot = data["robot"]
+        assert updated_robot["id"] == robot_id
         assert updated_robot["status"] == update_data["status"]
         assert updated_robot["battery_level"] == update_data["battery_level"]
         assert updated_robot["location"] == update_data["location"]
         
         print("✅ Update robot endpoint works correctly")
     
+    @pytest.mark.xdist_group("rw")
     def test_update_nonexistent_robot(self, api_client, test_data):
         """Test updating a robot that doesn't exist"""
         update_data = test_data["update_robot"]
@@ -140,53 +149,50 @@ class TestRoboticsAPI:
         
         print("✅ Update nonexistent robot returns proper error")
     
-    def test_get_tasks_list(self, api_client):
-        """Test getting the list of all tasks"""
-        response = api_client.get("/tasks")
-        
+    @pytest.mark.xdist_group("rw")
+    def test_robots_conditional_get(self, api_client, test_data):
+        """Test that /robots answers 304 to a current ETag until the data changes"""
+        url = f"{api_client.base_url}/robots"
+        response = api_client.session.get(url)
         assert response.status_code == 200
-        data = response.json()
-        assert "tasks" in data
-        assert isinstance(data["tasks"], list)
+        etag = response.headers["ETag"]
         
-        # If there are tasks, verify their structure
-        if len(data["tasks"]) > 0:
-            first_task = data["tasks"][0]
-            required_fields = ["id", "robot_id", "task_type", "status", "priority", "created_at"]
-            for field in required_fields:
-                assert field in first_task
+        # Unchanged data: the client's copy is still valid
+        response = api_client.session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
         
-        print("✅ Get tasks list endpoint works correctly")
+        # A write bumps the data version, so the old ETag no longer matches
+        assert api_client.post("/robots", json=test_data["robot"]).status_code == 201
+        response = api_client.session.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        
+        print("✅ Robots list revalidates with ETags")
     
-    def test_get_sensor_data(self, api_client):
-        """Test getting sensor data"""
-        response = api_client.get("/sensor-data")
+    def test_get_sensor_data_by_robot(self, api_client, sensor_readings):
+        """Test getting sensor data filtered by robot ID"""
+        response = api_client.get(f"/sensor-data?robot_id={sensor_readings}&limit=1")
         
         assert response.status_code == 200
         data = response.json()
         assert "sensor_data" in data
         assert isinstance(data["sensor_data"], list)
+        assert len(data["sensor_data"]) == 1
+        assert data["sensor_data"][0]["robot_id"] == sensor_readings
         
-        print("✅ Get sensor data endpoint works correctly")
+        print("✅ Get sensor data by robot ID works correctly")
     
-    def test_get_sensor_data_by_robot(self, api_client):
-        """Test getting sensor data filtered by robot ID"""
-        # First get a robot ID
-        robots_response = api_client.get("/robots")
-        assert robots_response.status_code == 200
-        
-        robots = robots_response.json()["robots"]
-        if len(robots) > 0:
-            robot_id = robots[0]["id"]
-            
-            response = api_client.get(f"/sensor-data?robot_id={robot_id}")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert "sensor_data" in data
-            assert isinstance(data["sensor_data"], list)
-            
-            print("✅ Get sensor data by robot ID works correctly")
+    @pytest.mark.usefixtures("sensor_readings")
+    @pytest.mark.parametrize("limit", ["abc", "1000"], ids=["non-integer", "above-max"])
+    def test_sensor_data_limit_fallback(self, api_client, limit):
+        """Test that an unusable ?limit falls back to, or is clamped at, 100 readings"""
+        response = api_client.get("/sensor-data", params={"limit": limit})
+        
+        assert response.status_code == 200
+        assert len(response.json()["sensor_data"]) == 100
+        
+        print(f"✅ Sensor data limit={limit} is served with 100 readings")
     
     def test_get_dashboard_stats(self, api_client):
         """Test getting dashboard statistics"""
@@ -214,10 +220,12 @@ class TestRoboticsAPI:
     
     def test_api_response_headers(self, api_client):
         """Test that API responses have proper headers"""
-        response = api_client.get("/robots")
-        
-        assert response.status_code == 200
-        headers = response.headers
+        # Reuse the headers the session captured from an earlier GET /robots
+        headers = api_client.api_headers
+        if headers is None:
+            response = api_client.get("/robots")
+            assert response.status_code == 200
+            headers = response.headers
         
         # Check for CORS headers
         assert "Access-Control-Allow-Origin" in headers
@@ -226,37 +234,35 @@ class TestRoboticsAPI:
         
         print("✅ API responses have proper headers")
     
-    def test_api_error_handling(self, api_client):
+    @pytest.mark.parametrize("method,endpoint,expected_statuses", [
+        ("get", "/invalid-endpoint", [404]),  # Invalid endpoint
+        ("post", "/robots/1", [405, 404, 500]),  # POST to specific robot endpoint
+    ], ids=["invalid-endpoint", "invalid-method"])
+    def test_api_error_handling(self, api_client, method, endpoint, expected_statuses):
         """Test API error handling for various scenarios"""
-        # Test invalid endpoint
-        response = api_client.get("/invalid-endpoint")
-        assert response.status_code == 404
-        
-        # Test invalid HTTP method
-        response = api_client.post("/robots/1")  # POST to specific robot endpoint
-        assert response.status_code in [405, 404, 500]  # Method not allowed or similar
+        response = getattr(api_client, method)(endpoint)
+        assert response.status_code in expected_statuses
         
-        print("✅ API error handling works correctly")
+        print(f"✅ API error handling works correctly for {method.upper()} {endpoint}")
     
-    def test_api_performance(self, api_client):
+    @pytest.mark.parametrize("endpoint", ["/health", "/robots", "/tasks", "/stats"])
+    def test_api_performance(self, api_client, endpoint):
         """Test API response times"""
-        endpoints = ["/health", "/robots", "/tasks", "/stats"]
+        start_time = time.time()
+        response = api_client.get(endpoint)
+        response_time = time.time() - start_time
         
-        for endpoint in endpoints:
-            start_time = time.time()
-            response = api_client.get(endpoint)
-            response_time = time.time() - start_time
-            
-            assert response.status_code == 200
-            assert response_time < 2.0, f"Endpoint {endpoint} took {response_time:.2f} seconds"
-            
-            print(f"✅ {endpoint} responded in {response_time:.3f} seconds")
+        assert response.status_code == 200
+        assert response_time < 2.0, f"Endpoint {endpoint} took {response_time:.2f} seconds"
+        
+        print(f"✅ {endpoint} responded in {response_time:.3f} seconds")
     
+    @pytest.mark.xdist_group("rw")
     def test_api_data_consistency(self, api_client):
         """Test that API data is consistent across calls"""
-        # Get robots list twice
-        response1 = api_client.get("/robots")
-        response2 = api_client.get("/robots")
+        # Get robots list twice, concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            response1, response2 = executor.map(api_client.get, ["/robots", "/robots"])
         
         assert response1.status_code == 200
         assert response2.status_code == 200
@@ -291,12 +297,11 @@ class TestRoboticsAPI:
     
     def test_api_rate_limiting(self, api_client):
         """Test API behavior under multiple rapid requests"""
-        # Make multiple rapid requests
-        responses = []
-        for i in range(10):
-            response = api_client.get("/health")
-            responses.append(response.status_code)
-            time.sleep(0.1)  # Small delay between requests
+        # Make multiple rapid requests, all in flight at once
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            responses = list(executor.map(
+                lambda _: api_client.get("/health").status_code, range(10)
+            ))
         
         # All requests should succeed
         assert all(status == 200 for status in responses)
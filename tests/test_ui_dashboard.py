@@ -2,95 +2,114 @@ import pytest
 import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.keys import Keys
 
+def set_viewport(driver, wait, width, height, element):
+    """Emulate a viewport size in the browser and wait for the element to follow"""
+    # DevTools emulation resizes the page's viewport without going through
+    # the window manager, and innerWidth then matches width exactly
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": width,
+        "height": height,
+        "deviceScaleFactor": 1,
+        "mobile": width < 768,
+    })
+    wait.until(lambda d: d.execute_script("return window.innerWidth") == width)
+    wait.until(EC.visibility_of(element))
+
+@pytest.mark.xdist_group("ui")
 class TestDashboardUI:
     """UI Tests for Robotics Dashboard"""
     
-    def test_dashboard_loads_successfully(self, driver, wait, start_application):
+    @pytest.fixture(scope="class", autouse=True)
+    def implicit_wait(self, _browser):
+        """Let find_element poll in the browser for elements still rendering"""
+        # Set once for the class; the shared browser runs without one elsewhere
+        _browser.implicitly_wait(5)
+        yield
+        _browser.implicitly_wait(0)
+    
+    @pytest.fixture(autouse=True)
+    def dashboard_page(self, driver, app_url, start_application):
+        """Load the dashboard once and reuse it while the browser stays on it"""
+        if driver.current_url.rstrip("/") != app_url:
+            driver.get(app_url)
+        else:
+            driver.execute_script("window.scrollTo(0, 0);")
+    
+    def test_dashboard_loads_successfully(self, driver):
         """Test that dashboard loads with all elements visible"""
-        driver.get("http://localhost:5000")
-        
-        # Wait for page to load
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        page = driver.execute_script("""
+            return {
+                title: document.title,
+                h1: document.querySelector('h1').innerText.trim(),
+                stats: document.getElementsByClassName('stats-card').length,
+                hasList: !!document.getElementById('robotList'),
+                hasForm: !!document.getElementById('addRobotForm')
+            };
+        """)
         
         # Verify main elements are present
-        assert "Robotics Control Dashboard" in driver.title
-        assert driver.find_element(By.TAG_NAME, "h1").text == "Robotics Control Dashboard"
+        assert "Robotics Control Dashboard" in page["title"]
+        assert page["h1"] == "Robotics Control Dashboard"
         
         # Check statistics cards
-        stats_cards = driver.find_elements(By.CLASS_NAME, "stats-card")
-        assert len(stats_cards) == 4
+        assert page["stats"] == 4
         
         # Check main dashboard sections
-        assert driver.find_element(By.ID, "robotList")
-        assert driver.find_element(By.ID, "addRobotForm")
+        assert page["hasList"]
+        assert page["hasForm"]
         
         print("✅ Dashboard loads successfully with all elements")
     
-    def test_robot_list_display(self, driver, wait, start_application):
+    def test_robot_list_display(self, driver):
         """Test that robot list displays correctly"""
-        driver.get("http://localhost:5000")
-        
         # Wait for robots to load
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "robot-card")))
+        driver.find_element(By.CLASS_NAME, "robot-card")
+        
+        robot_list = driver.execute_script("""
+            const cards = document.getElementsByClassName('robot-card');
+            const first = cards[0];
+            return {
+                count: cards.length,
+                hasTitle: !!(first && first.querySelector('.card-title')),
+                hasBadge: !!(first && first.querySelector('.badge'))
+            };
+        """)
         
         # Check if robots are displayed
-        robot_cards = driver.find_elements(By.CLASS_NAME, "robot-card")
-        assert len(robot_cards) > 0
+        assert robot_list["count"] > 0
         
         # Verify robot information is displayed
-        first_robot = robot_cards[0]
-        assert first_robot.find_element(By.CLASS_NAME, "card-title")
-        assert first_robot.find_element(By.CLASS_NAME, "badge")
+        assert robot_list["hasTitle"]
+        assert robot_list["hasBadge"]
         
         print("✅ Robot list displays correctly")
     
-    def test_add_robot_functionality(self, driver, wait, start_application):
+    def test_add_robot_functionality(self, driver, wait):
         """Test adding a new robot through the UI"""
-        driver.get("http://localhost:5000")
-        
-        # Wait for form to be present
-        wait.until(EC.presence_of_element_located((By.ID, "addRobotForm")))
-        
-        # Fill out the form
+        # Fill out and submit the form in one round trip; the page is reused
+        # from earlier tests, so reset it first
         robot_name = f"TestBot-{int(time.time())}"
-        driver.find_element(By.ID, "robotName").send_keys(robot_name)
-        
-        # Select status
-        status_select = Select(driver.find_element(By.ID, "robotStatus"))
-        status_select.select_by_value("active")
-        
-        # Set battery level
-        driver.find_element(By.ID, "batteryLevel").clear()
-        driver.find_element(By.ID, "batteryLevel").send_keys("85")
-        
-        # Set location
-        driver.find_element(By.ID, "location").clear()
-        driver.find_element(By.ID, "location").send_keys("Test Location")
-        
-        # Submit form
-        driver.find_element(By.CSS_SELECTOR, "#addRobotForm button[type='submit']").click()
+        driver.execute_script("""
+            document.getElementById('addRobotForm').reset();
+            document.getElementById('robotName').value = arguments[0];
+            document.getElementById('robotStatus').value = 'active';
+            document.getElementById('batteryLevel').value = '85';
+            document.getElementById('location').value = 'Test Location';
+            document.querySelector("#addRobotForm button[type='submit']").click();
+        """, robot_name)
         
         # Wait for robot to be added (check if it appears in the list)
-        wait.until(EC.presence_of_element_located((By.XPATH, f"//h6[contains(text(), '{robot_name}')]")))
-        
-        # Verify robot was added
-        robot_cards = driver.find_elements(By.CLASS_NAME, "robot-card")
-        robot_names = [card.find_element(By.CLASS_NAME, "card-title").text for card in robot_cards]
-        assert robot_name in robot_names
+        wait.until(EC.presence_of_element_located(
+            (By.CSS_SELECTOR, f".robot-card[data-name='{robot_name}']")
+        ))
         
         print("✅ Robot added successfully through UI")
     
-    def test_dashboard_charts(self, driver, wait, start_application):
+    def test_dashboard_charts(self, driver):
         """Test that charts are displayed and functional"""
-        driver.get("http://localhost:5000")
-        
-        # Wait for charts to load
-        wait.until(EC.presence_of_element_located((By.ID, "statusChart")))
-        wait.until(EC.presence_of_element_located((By.ID, "batteryChart")))
-        
         # Check if charts are present
         status_chart = driver.find_element(By.ID, "statusChart")
         battery_chart = driver.find_element(By.ID, "batteryChart")
@@ -99,59 +118,60 @@ class TestDashboardUI:
         assert battery_chart.is_displayed()
         
         # Verify chart containers have proper dimensions
-        chart_containers = driver.find_elements(By.CLASS_NAME, "chart-container")
-        assert len(chart_containers) == 2
-        
-        for container in chart_containers:
-            height = container.value_of_css_property("height")
-            assert height != "0px"
+        heights = driver.execute_script(
+            "return Array.from(document.querySelectorAll('.chart-container'))"
+            ".map(e => e.getBoundingClientRect().height);"
+        )
+        assert len(heights) == 2
+        assert all(height > 0 for height in heights)
         
         print("✅ Dashboard charts display correctly")
     
-    def test_dashboard_responsiveness(self, driver, wait, start_application):
+    def test_dashboard_responsiveness(self, driver, wait):
         """Test dashboard responsiveness on different screen sizes"""
-        driver.get("http://localhost:5000")
-        
-        # Test desktop view
-        driver.set_window_size(1920, 1080)
-        time.sleep(2)
-        
-        # Check if all elements are visible
-        assert driver.find_element(By.ID, "robotList").is_displayed()
-        assert driver.find_element(By.ID, "addRobotForm").is_displayed()
-        
-        # Test tablet view
-        driver.set_window_size(768, 1024)
-        time.sleep(2)
-        
-        # Check if layout adjusts
+        # Look the elements up once; the layout changes but the nodes stay
         robot_list = driver.find_element(By.ID, "robotList")
-        assert robot_list.is_displayed()
-        
-        # Test mobile view
-        driver.set_window_size(375, 667)
-        time.sleep(2)
-        
-        # Check if mobile layout works
-        assert driver.find_element(By.ID, "robotList").is_displayed()
-        
-        # Reset to desktop
-        driver.set_window_size(1920, 1080)
+        add_robot_form = driver.find_element(By.ID, "addRobotForm")
+        
+        try:
+            # Test desktop view
+            set_viewport(driver, wait, 1920, 1080, robot_list)
+            
+            # Check if all elements are visible
+            assert robot_list.is_displayed()
+            assert add_robot_form.is_displayed()
+            
+            # Test tablet view
+            set_viewport(driver, wait, 768, 1024, robot_list)
+            
+            # Check if layout adjusts
+            assert robot_list.is_displayed()
+            
+            # Test mobile view
+            set_viewport(driver, wait, 375, 667, robot_list)
+            
+            # Check if mobile layout works
+            assert robot_list.is_displayed()
+        finally:
+            # Back to the real window size; the override would otherwise
+            # outlive this test in the shared browser
+            driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
         
         print("✅ Dashboard is responsive across different screen sizes")
     
-    def test_real_time_updates(self, driver, wait, start_application):
+    def test_real_time_updates(self, driver, wait):
         """Test that dashboard updates in real-time"""
-        driver.get("http://localhost:5000")
-        
         # Wait for initial load
         wait.until(EC.presence_of_element_located((By.ID, "totalRobots")))
+        initial = wait.until(lambda d: d.execute_script("return window.__refreshCounter||0"))
         
         # Get initial robot count
         initial_count = int(driver.find_element(By.ID, "totalRobots").text)
         
-        # Wait for potential updates (dashboard refreshes every 10 seconds)
-        time.sleep(12)
+        # Wait for the next refresh (dashboard refreshes every 10 seconds)
+        WebDriverWait(driver, 15).until(
+            lambda d: d.execute_script("return window.__refreshCounter||0") > initial
+        )
         
         # Check if data is still displayed (indicating refresh worked)
         current_count = int(driver.find_element(By.ID, "totalRobots").text)
@@ -161,20 +181,21 @@ class TestDashboardUI:
         
         print("✅ Dashboard updates in real-time")
     
-    def test_navigation_and_interactions(self, driver, wait, start_application):
+    def test_navigation_and_interactions(self, driver, wait):
         """Test various navigation and interaction elements"""
-        driver.get("http://localhost:5000")
-        
         # Wait for page to load
         wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         
-        # Test scrolling
+        # Test scrolling; Bootstrap turns on smooth scrolling, so wait for the
+        # position to settle (a page shorter than the window cannot move)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1)
+        wait.until(lambda d: d.execute_script(
+            "return window.scrollY > 0 || document.body.scrollHeight <= window.innerHeight;"
+        ))
         
         # Scroll back to top
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
+        wait.until(lambda d: d.execute_script("return window.scrollY === 0;"))
         
         # Test form interactions
         robot_name_field = driver.find_element(By.ID, "robotName")
@@ -188,68 +209,63 @@ class TestDashboardUI:
         
         print("✅ Navigation and interactions work correctly")
     
-    def test_error_handling_ui(self, driver, wait, start_application):
+    def test_error_handling_ui(self, driver):
         """Test UI error handling and validation"""
-        driver.get("http://localhost:5000")
-        
-        # Wait for form to load
-        wait.until(EC.presence_of_element_located((By.ID, "addRobotForm")))
-        
-        # Try to submit empty form
-        submit_button = driver.find_element(By.CSS_SELECTOR, "#addRobotForm button[type='submit']")
-        submit_button.click()
+        attrs = driver.execute_script("""
+            const name = document.getElementById('robotName');
+            const battery = document.getElementById('batteryLevel');
+            return {required: name.hasAttribute('required'), max: battery.getAttribute('max')};
+        """)
         
         # Check if form validation works (HTML5 validation)
-        robot_name_field = driver.find_element(By.ID, "robotName")
-        assert robot_name_field.get_attribute("required") is not None
+        assert attrs["required"]
         
-        # Test invalid battery level
-        battery_field = driver.find_element(By.ID, "batteryLevel")
-        battery_field.clear()
-        battery_field.send_keys("150")  # Invalid value > 100
-        
-        # Check if HTML5 validation catches this
-        assert battery_field.get_attribute("max") == "100"
+        # Check if HTML5 validation caps the battery level
+        assert attrs["max"] == "100"
         
         print("✅ UI error handling and validation work correctly")
     
-    def test_dashboard_performance(self, driver, wait, start_application):
+    def test_dashboard_performance(self, driver, wait, app_url):
         """Test dashboard performance and loading times"""
-        start_time = time.time()
-        
-        driver.get("http://localhost:5000")
+        driver.get(app_url)
         
-        # Wait for page to fully load
+        # Wait for page to fully load (synchronization only, not timing)
         wait.until(EC.presence_of_element_located((By.ID, "robotList")))
         wait.until(EC.presence_of_element_located((By.ID, "statusChart")))
         
-        load_time = time.time() - start_time
+        # Read the load time from the browser's Navigation Timing entry; with
+        # the eager page load strategy the load event may still be pending
+        nav = wait.until(lambda d: d.execute_script(
+            "const nav = performance.getEntriesByType('navigation')[0];"
+            "return nav && nav.loadEventEnd > 0 ? nav.toJSON() : null;"
+        ))
+        load_time = (nav["loadEventEnd"] - nav["startTime"]) / 1000
         
         # Dashboard should load within reasonable time (less than 10 seconds)
         assert load_time < 10, f"Dashboard took {load_time:.2f} seconds to load"
         
         print(f"✅ Dashboard loads in {load_time:.2f} seconds")
     
-    def test_accessibility_features(self, driver, wait, start_application):
+    def test_accessibility_features(self, driver):
         """Test basic accessibility features"""
-        driver.get("http://localhost:5000")
-        
-        # Wait for page to load
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        snapshot = driver.execute_script("""
+            return {
+                h1: document.querySelectorAll('h1').length,
+                labels: document.querySelectorAll('label').length,
+                imgsNoAlt: Array.from(document.images)
+                    .filter(img => !img.hasAttribute('alt'))
+                    .map(img => img.src)
+            };
+        """)
         
         # Check for proper heading structure
-        headings = driver.find_elements(By.TAG_NAME, "h1")
-        assert len(headings) > 0
+        assert snapshot["h1"] > 0
         
         # Check for alt text on images (if any)
-        images = driver.find_elements(By.TAG_NAME, "img")
-        for img in images:
-            alt_text = img.get_attribute("alt")
-            if alt_text is None:
-                print("⚠️ Image without alt text found")
+        for src in snapshot["imgsNoAlt"]:
+            print(f"⚠️ Image without alt text found: {src}")
         
         # Check for form labels
-        form_labels = driver.find_elements(By.TAG_NAME, "label")
-        assert len(form_labels) > 0
+        assert snapshot["labels"] > 0
         
         print("✅ Basic accessibility features are present") 
\ No newline at end of file